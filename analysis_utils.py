@@ -1,5 +1,167 @@
+import functools
+import os
+
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+
+# Column dtypes for the dust flux CSV, applied at parse time so the category
+# columns are never materialised as Python strings
+_SCHEMA = {
+    "ID": "Int32",
+    "Ecosystem": "category",
+    "Season": "category",
+    "P_conc": "float32",
+    "Ca_conc": "float32",
+    "flux_gm2yr": "float32",
+}
+
+# Valid group_by values for visualize_dataset
+_ALLOWED_GROUPBY = frozenset({"Ecosystem", "Season", None})
+
+# Axis labels for the known dataset columns; other columns use their name
+_COLUMN_LABELS = {
+    "P_conc": "P concentration",
+    "Ca_conc": "Ca concentration",
+    "flux_gm2yr": "Flux (g/m²/yr)",
+}
+
+# Conversion factors to square meters, and the from/to ratio matrix built
+# from them so a conversion is a single multiply
+_AREA_UNITS = ("m2", "km2", "hectare", "acre")
+_UNIT_INDEX = {unit: i for i, unit in enumerate(_AREA_UNITS)}
+_FACTORS_TO_M2 = np.array([
+    1,
+    1_000_000,      # 1 km² = 1,000,000 m²
+    10_000,         # 1 hectare = 10,000 m²
+    4046.8564224,   # 1 acre ≈ 4046.8564224 m²
+])
+_AREA_RATIO = _FACTORS_TO_M2[:, None] / _FACTORS_TO_M2[None, :]
+
+def _parse_csv(csv_path) -> pd.DataFrame:
+    """
+    Parse a CSV with _SCHEMA, falling back to pandas' own type inference
+    when the file doesn't fit the schema (e.g. string IDs).
+    """
+    start = csv_path.tell() if hasattr(csv_path, "seek") else None
+    try:
+        return pd.read_csv(csv_path, dtype=_SCHEMA)
+    except ValueError:
+        if start is not None:
+            csv_path.seek(start)
+        return pd.read_csv(csv_path)
+
+@functools.lru_cache(maxsize=8)
+def _read_csv_cached(path: str, mtime_ns: int, size: int) -> pd.DataFrame:
+    """
+    Parse a CSV once per (path, mtime, size). Callers must not mutate the
+    returned DataFrame; use _read_csv instead.
+    """
+    return _parse_csv(path)
+
+def _read_csv(csv_path) -> pd.DataFrame:
+    """
+    Read a CSV, going through the parse cache for local files and returning
+    a private copy. Buffers, URLs and other read_csv inputs are parsed
+    directly.
+    """
+    if not (isinstance(csv_path, (str, os.PathLike)) and os.path.isfile(csv_path)):
+        return _parse_csv(csv_path)
+    st = os.stat(csv_path)
+    df = _read_csv_cached(os.path.abspath(csv_path), st.st_mtime_ns, st.st_size)
+    return df.copy()
+
+def _ensure_categoricals(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert the "Ecosystem" and "Season" columns to categorical in place.
+
+    Columns that are already categorical are left untouched, so repeated
+    calls on the same DataFrame cost nothing.
+    """
+    for col in ("Ecosystem", "Season"):
+        if col not in df.columns or isinstance(df[col].dtype, pd.CategoricalDtype):
+            continue
+        codes, uniques = pd.factorize(df[col], sort=True)
+        df[col] = pd.Categorical.from_codes(codes, categories=uniques)
+    return df
+
+def _to_soa(df: pd.DataFrame, columns: tuple) -> np.ndarray:
+    """
+    Return the given numeric columns as one C-contiguous float32 array of
+    shape (len(columns), len(df)), so each column is a contiguous row.
+    """
+    return np.ascontiguousarray(df[list(columns)].to_numpy(dtype=np.float32).T)
+
+def _grouped_scatter(ax, x: np.ndarray, y: np.ndarray, cat: pd.Series, group_by: str) -> None:
+    """
+    Draw a scatter plot coloured by a categorical column as a single
+    PathCollection, with one legend entry per observed category.
+    """
+    import matplotlib
+    from matplotlib.lines import Line2D
+
+    codes = cat.cat.codes.to_numpy()
+    observed = codes >= 0
+    palette = matplotlib.colormaps["tab10"].colors
+    colors = np.asarray(palette)[codes[observed] % len(palette)]
+    ax.scatter(x[observed], y[observed], c=colors, alpha=0.7)
+    present = np.unique(codes[observed])
+    handles = [
+        Line2D([0], [0], marker="o", linestyle="", color=palette[i % len(palette)])
+        for i in present
+    ]
+    ax.legend(handles, list(cat.cat.categories[present]), title=group_by)
+
+def _new_figure(figsize: tuple, show: bool):
+    """
+    Create a figure and axes: pyplot-managed when the figure will be shown,
+    otherwise a standalone Agg figure that is returned to the caller.
+    """
+    if show:
+        import matplotlib.pyplot as plt
+        return plt.subplots(figsize=figsize)
+
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot()
+
+def _box_stats(values: np.ndarray, gb_idx: dict, whis: float = 1.5) -> list:
+    """
+    Compute matplotlib boxplot statistics for each group directly from the
+    sorted group values, for use with Axes.bxp.
+
+    Quartiles use linear interpolation and whiskers extend to the furthest
+    point within whis * IQR, matching Axes.boxplot. NaN values are ignored.
+    """
+    stats = []
+    for key, ix in gb_idx.items():
+        v = values[ix]
+        v = np.sort(v[~np.isnan(v)])
+        n = len(v)
+        if n == 0:
+            stats.append({"label": str(key), "med": np.nan, "q1": np.nan, "q3": np.nan,
+                          "whislo": np.nan, "whishi": np.nan, "fliers": v})
+            continue
+
+        # Linearly interpolated quartiles on the sorted values
+        pos = np.array([0.25, 0.5, 0.75]) * (n - 1)
+        lo = np.floor(pos).astype(np.intp)
+        hi = np.minimum(lo + 1, n - 1)
+        q1, med, q3 = v[lo] + (pos - lo) * (v[hi] - v[lo])
+
+        # Whiskers reach the last data point inside the whis * IQR fences
+        iqr = q3 - q1
+        i_lo = np.searchsorted(v, q1 - whis * iqr, side="left")
+        i_hi = np.searchsorted(v, q3 + whis * iqr, side="right")
+        whislo = min(v[i_lo], q1)
+        whishi = max(v[i_hi - 1], q3)
+
+        stats.append({"label": str(key), "med": med, "q1": q1, "q3": q3,
+                      "whislo": whislo, "whishi": whishi,
+                      "fliers": np.concatenate((v[v < whislo], v[v > whishi]))})
+    return stats
 
 def load_dataset(csv_path: str = None, df: pd.DataFrame = None) -> pd.DataFrame:
     """
@@ -15,18 +177,24 @@ def load_dataset(csv_path: str = None, df: pd.DataFrame = None) -> pd.DataFrame:
     Returns
     -------
     pandas.DataFrame
-        A cleaned DataFrame with categorical types applied.
+        A cleaned DataFrame with categorical types applied and integer IDs
+        stored as Int32.
     """
     if df is None:
         if csv_path is None:
             raise ValueError("Provide either a CSV file path or a DataFrame.")
-        df = pd.read_csv(csv_path)
+        df = _read_csv(csv_path)
+
+    # Ensure correct dtypes
+    _ensure_categoricals(df)
 
-    # Ensure correct dtypes - make this generic
-    if "Ecosystem" in df.columns:
-        df["Ecosystem"] = df["Ecosystem"].astype("category")
-    if "Season" in df.columns:
-        df["Season"] = df["Season"].astype("category")
+    # Downcast integer IDs to the CSV schema's Int32 when they fit; other IDs
+    # and the float columns are left as the caller gave them
+    if "ID" in df.columns and pd.api.types.is_integer_dtype(df["ID"]):
+        ids = df["ID"]
+        info = np.iinfo(np.int32)
+        if ids.isna().all() or (info.min <= ids.min() and ids.max() <= info.max):
+            df["ID"] = ids.astype(_SCHEMA["ID"])
 
     return df
 
@@ -47,147 +215,182 @@ def group_dataset(csv_path: str = None, df: pd.DataFrame = None, group_by: str =
     pandas.DataFrame
         A cleaned DataFrame with categorical types applied.
     """
-    if df is None:
-        if csv_path is None:
-            raise ValueError("Provide either a CSV file path or a DataFrame.")
-        df = pd.read_csv(csv_path)
-
-    # Ensure correct dtypes
-    if "Ecosystem" in df.columns:
-        df["Ecosystem"] = df["Ecosystem"].astype("category")
-    if "Season" in df.columns:
-        df["Season"] = df["Season"].astype("category")
+    df = load_dataset(csv_path=csv_path, df=df)
 
     # Return grouped object if requested
     if group_by:
         if group_by not in df.columns:
             raise ValueError(f"group_by must be a column in DataFrame. Got '{group_by}'.")
-        return df.groupby(group_by, observed=True) # this isn't great
+        return df.groupby(group_by, observed=True, sort=False)
 
     return df
 
-def visualize_dataset(csv_path: str = None, df: pd.DataFrame = None, group_by: str = None, value_col: str = None, scatter_x: str = None, scatter_y: str = None) -> None:
+def visualize_dataset(
+    csv_path: str = None,
+    df: pd.DataFrame = None,
+    group_by: str = "Ecosystem",
+    value_col: str = "flux_gm2yr",
+    scatter_pairs: tuple = (("P_conc", "Ca_conc"), ("P_conc", "flux_gm2yr")),
+    show: bool = True,
+) -> list | None:
     """
-    General function to visualize a dataset as a scatter plot using pandas and matplotlib.
+    Visualize ecosystem dataset using pandas and matplotlib.
 
     Parameters
     ----------
     csv_path : str, optional
         Path to the CSV file. Required if df is not provided.
     df : pandas.DataFrame, optional
-        DataFrame to visualize. If not provided, will load from csv_path.
-    group_by : str, optional
-        Column to group by in plots (e.g., categorical variable).
-    value_col : str, optional
-        Column to use for boxplot values.
-    scatter_x : str, optional
-        Column for x-axis in scatter plots.
-    scatter_y : str, optional
-        Column for y-axis in scatter plots.
+        A DataFrame with the required columns:
+        ['ID', 'Ecosystem', 'Season', 'P_conc', 'Ca_conc', 'flux_gm2yr'].
+    group_by : str, default="Ecosystem"
+        Column to group by in plots. Options: "Ecosystem", "Season", or None.
+    value_col : str, default="flux_gm2yr"
+        Column to use for boxplot values. Set to None to skip the boxplot.
+    scatter_pairs : tuple of (str, str), optional
+        (x, y) column pairs to draw as scatter plots, colored by group if
+        group_by is given.
+    show : bool, default=True
+        Display the plots with pyplot. If False, the figures are built off
+        pyplot, rendered with the Agg backend and returned.
 
     Returns
     -------
-    None
-        Displays matplotlib plots (no return value).
+    list of matplotlib.figure.Figure or None
+        The rendered figures if show is False, otherwise None (the plots
+        are displayed).
     """
+    # Validate group_by
+    if group_by not in _ALLOWED_GROUPBY:
+        raise ValueError("group_by must be 'Ecosystem', 'Season', or None")
+
+    # Plotting must not change the caller's frame, so only the categoricals
+    # are applied, and to a shallow copy
     if df is None:
-        if csv_path is None:
-            raise ValueError("Provide either a CSV file path or a DataFrame.")
-        df = pd.read_csv(csv_path)
+        df = load_dataset(csv_path=csv_path)
+    else:
+        df = _ensure_categoricals(df.copy(deep=False))
 
-    # Boxplot by group
-    if group_by and value_col:
-        plt.figure(figsize=(8, 5))
-        df.boxplot(column=value_col, by=group_by, grid=False)
-        plt.title(f"{value_col} by {group_by}")
-        plt.suptitle("")
-        plt.xlabel(group_by)
-        plt.ylabel(value_col)
-        plt.show()
+    # Group categories, computed once and shared by all scatter plots
+    if group_by:
+        cat = df[group_by].astype("category")
+
+    # Pack the plotted columns into one float32 block, shared by all plots
+    plot_cols = tuple(dict.fromkeys(
+        ([value_col] if value_col else []) + [col for pair in scatter_pairs for col in pair]
+    ))
+    arrays = dict(zip(plot_cols, _to_soa(df, plot_cols)))
 
-    # Scatter plot
-    if scatter_x and scatter_y:
-        plt.figure(figsize=(7, 6))
+    figs = []
+
+    # 1. Boxplot of values by group
+    if group_by and value_col:
+        # Group row indices, in category order to match the scatter legends
+        indices = df.groupby(group_by, observed=True, sort=False).indices
+        gb_idx = {key: indices[key] for key in cat.cat.categories if key in indices}
+
+        fig, ax = _new_figure((8, 5), show)
+        ax.bxp(_box_stats(arrays[value_col], gb_idx))
+        ax.set_title(f"{_COLUMN_LABELS.get(value_col, value_col)} by {group_by}")
+        ax.set_xlabel(group_by)
+        ax.set_ylabel(_COLUMN_LABELS.get(value_col, value_col))
+        figs.append(fig)
+
+    # 2. Scatter plots (colored by group if specified)
+    for scatter_x, scatter_y in scatter_pairs:
+        x_label = _COLUMN_LABELS.get(scatter_x, scatter_x)
+        y_label = _COLUMN_LABELS.get(scatter_y, scatter_y)
+        x = arrays[scatter_x]
+        y = arrays[scatter_y]
+
+        fig, ax = _new_figure((7, 6), show)
         if group_by:
-            for key, group in df.groupby(group_by):
-                plt.scatter(group[scatter_x], group[scatter_y], label=key, alpha=0.7)
-            plt.legend(title=group_by)
+            _grouped_scatter(ax, x, y, cat, group_by)
         else:
-            plt.scatter(df[scatter_x], df[scatter_y], c="blue", alpha=0.7)
-        plt.title(f"{scatter_y} vs {scatter_x}{' by ' + group_by if group_by else ''}")
-        plt.xlabel(scatter_x)
-        plt.ylabel(scatter_y)
+            ax.scatter(x, y, c="blue", alpha=0.7)
+        ax.set_title(f"{y_label} vs {x_label}{' by ' + group_by if group_by else ''}")
+        ax.set_xlabel(x_label)
+        ax.set_ylabel(y_label)
+        figs.append(fig)
+
+    if show:
+        import matplotlib.pyplot as plt
         plt.show()
+        return None
 
-def visualize_dataset(csv_path: str = None, df: pd.DataFrame = None, group_by: str = "Ecosystem") -> None:
+    for fig in figs:
+        fig.canvas.draw()
+    return figs
+
+def fast_group_sum(df: pd.DataFrame, key: str, val: str) -> tuple:
     """
-    Visualize ecosystem dataset using pandas and matplotlib.
+    Sum and count a column per group without pandas' groupby machinery.
+
+    Rows are sorted by the group's categorical codes once and summed at the
+    group boundaries with np.add.reduceat. Rows with a missing key or value
+    are skipped, as in groupby(...).sum() and .count().
 
     Parameters
     ----------
-    csv_path : str, optional
-        Path to the CSV file. Required if df is not provided.
-    df : pandas.DataFrame, optional
-        A DataFrame with the required columns:
-        ['ID', 'Ecosystem', 'Season', 'P_conc', 'Ca_conc', 'flux_gm2yr'].
-    group_by : str, default="Ecosystem"
-        Column to group by in plots. Options: "Ecosystem", "Season", or None.
+    df : pandas.DataFrame
+        DataFrame holding the key and value columns.
+    key : str
+        Column to group by (converted to categorical if it isn't already).
+    val : str
+        Numeric column to sum.
 
     Returns
     -------
-    None
-        Displays matplotlib plots (no return value).
-    """
-    if df is None:
-        if csv_path is None:
-            raise ValueError("Provide either a CSV file path or a DataFrame.")
-        df = pd.read_csv(csv_path)
-
-    # Validate group_by
-    if group_by not in ["Ecosystem", "Season", None]:
-        raise ValueError("group_by must be 'Ecosystem', 'Season', or None")
-
-    # Ensure correct dtypes
-    if "Ecosystem" in df.columns:
-        df["Ecosystem"] = df["Ecosystem"].astype("category")
-    if "Season" in df.columns:
-        df["Season"] = df["Season"].astype("category")
+    tuple of numpy.ndarray
+        (sums, counts, keys) for each observed group, ordered by category.
 
-    # 1. Boxplot of flux by group
-    if group_by:
-        plt.figure(figsize=(8, 5))
-        df.boxplot(column="flux_gm2yr", by=group_by, grid=False)
-        plt.title(f"Flux by {group_by}")
-        plt.suptitle("")
-        plt.xlabel(group_by)
-        plt.ylabel("Flux (g/m²/yr)")
-        plt.show()
+    Examples
+    --------
+    Missing keys and values are dropped exactly as groupby drops them:
+
+    >>> frame = pd.DataFrame({"Season": ["NDJ", "FMA", None, "NDJ", "FMA"],
+    ...                       "flux_gm2yr": [1.0, 2.0, 4.0, np.nan, 8.0]})
+    >>> sums, counts, keys = fast_group_sum(frame, "Season", "flux_gm2yr")
+    >>> keys.tolist(), sums.tolist(), counts.tolist()
+    (['FMA', 'NDJ'], [10.0, 1.0], [2, 1])
+    >>> grouped = frame.groupby("Season")["flux_gm2yr"]
+    >>> grouped.sum().tolist() == sums.tolist(), grouped.count().tolist() == counts.tolist()
+    (True, True)
+    """
+    cat = df[key].astype("category")
+    codes = cat.cat.codes.to_numpy()
+    values = df[val].to_numpy()
+    keep = (codes >= 0) & ~np.isnan(values)
+    codes, values = codes[keep], values[keep]
+    if len(codes) == 0:
+        return values[:0], np.zeros(0, dtype=np.intp), cat.cat.categories.to_numpy()[:0]
+
+    order = np.argsort(codes, kind="stable")
+    sc = codes[order]
+    sv = values[order]
+    boundaries = np.flatnonzero(np.concatenate(([True], sc[1:] != sc[:-1])))
+    sums = np.add.reduceat(sv, boundaries)
+    counts = np.diff(np.append(boundaries, len(sc)))
+    return sums, counts, cat.cat.categories.to_numpy()[sc[boundaries]]
+
+def _area_ratio(from_unit: str, to_unit: str) -> float:
+    """
+    Look up the from_unit -> to_unit multiplier in the ratio matrix.
+    """
+    # Only lowercase the units when the exact spelling isn't a known unit
+    try:
+        i = _UNIT_INDEX[from_unit]
+    except KeyError:
+        i = _UNIT_INDEX.get(from_unit.lower())
+    try:
+        j = _UNIT_INDEX[to_unit]
+    except KeyError:
+        j = _UNIT_INDEX.get(to_unit.lower())
+
+    if i is None or j is None:
+        raise ValueError("Units must be one of: 'm2', 'km2', 'hectare', 'acre'")
 
-    # 2. Scatter plot: P vs Ca (colored by group if specified)
-    plt.figure(figsize=(7, 6))
-    if group_by:
-        for key, group in df.groupby(group_by):
-            plt.scatter(group["P_conc"], group["Ca_conc"], label=key, alpha=0.7)
-        plt.legend(title=group_by)
-    else:
-        plt.scatter(df["P_conc"], df["Ca_conc"], c="blue", alpha=0.7)
-    plt.title(f"P vs Ca Concentration{' by ' + group_by if group_by else ''}")
-    plt.xlabel("P concentration")
-    plt.ylabel("Ca concentration")
-    plt.show()
-
-    # 3. Scatter plot: Flux vs P concentration
-    plt.figure(figsize=(7, 6))
-    if group_by:
-        for key, group in df.groupby(group_by):
-            plt.scatter(group["P_conc"], group["flux_gm2yr"], label=key, alpha=0.7)
-        plt.legend(title=group_by)
-    else:
-        plt.scatter(df["P_conc"], df["flux_gm2yr"], c="blue", alpha=0.7)
-    plt.title(f"Flux vs P Concentration{' by ' + group_by if group_by else ''}")
-    plt.xlabel("P concentration")
-    plt.ylabel("Flux (g/m²/yr)")
-    plt.show()
+    return _AREA_RATIO[i, j]
 
 def convert_area(value: float, from_unit: str, to_unit: str) -> float:
     """
@@ -196,8 +399,9 @@ def convert_area(value: float, from_unit: str, to_unit: str) -> float:
 
     Parameters
     ----------
-    value : float
-        The numeric value of the area to convert.
+    value : float or array-like
+        The numeric value of the area to convert. Arrays and Series are
+        converted element-wise.
     from_unit : str
         The unit of the input value. Must be one of:
         "m2", "km2", "acre", "hectare".
@@ -207,8 +411,8 @@ def convert_area(value: float, from_unit: str, to_unit: str) -> float:
 
     Returns
     -------
-    float
-        The converted area in the target unit.
+    float or array-like
+        The converted area in the target unit, of the same kind as value.
 
     Examples
     --------
@@ -219,23 +423,27 @@ def convert_area(value: float, from_unit: str, to_unit: str) -> float:
     >>> convert_area(1, "km2", "acre")
     247.105
     """
-    # Conversion factors to square meters
-    factors_to_m2 = {
-        "m2": 1,
-        "km2": 1_000_000,       # 1 km² = 1,000,000 m²
-        "hectare": 10_000,      # 1 hectare = 10,000 m²
-        "acre": 4046.8564224,   # 1 acre ≈ 4046.8564224 m²
-    }
-
-    from_unit = from_unit.lower()
-    to_unit = to_unit.lower()
-
-    if from_unit not in factors_to_m2 or to_unit not in factors_to_m2:
-        raise ValueError("Units must be one of: 'm2', 'km2', 'hectare', 'acre'")
+    converted = value * _area_ratio(from_unit, to_unit)
+    return float(converted) if np.ndim(value) == 0 else converted
 
-    # Convert to square meters first
-    value_in_m2 = value * factors_to_m2[from_unit]
+def convert_area_array(values: np.ndarray, from_unit: str, to_unit: str) -> np.ndarray:
+    """
+    Convert an array of area measurements with a single vectorized multiply.
 
-    # Then convert from m² to target unit
-    return value_in_m2 / factors_to_m2[to_unit]
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Areas to convert.
+    from_unit : str
+        The unit of the input values. Must be one of:
+        "m2", "km2", "acre", "hectare".
+    to_unit : str
+        The target unit to convert to. Must be one of:
+        "m2", "km2", "acre", "hectare".
 
+    Returns
+    -------
+    numpy.ndarray
+        The converted areas in the target unit.
+    """
+    return np.asarray(values) * _area_ratio(from_unit, to_unit)